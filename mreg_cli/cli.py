@@ -183,16 +183,19 @@ class Command(Completer):
         # If current word is empty then no flag is suggested
         if not cur:
             return
+        # Collect the flags on the line in one pass, instead of scanning
+        # the words once for every known flag.
+        used_flags = {word[1:] for word in words if word.startswith('-')}
         # If the current word is - then it is the beginning of a flag
         if cur == '-':
             cur = ''
         # If current word doesn't start with - then it isn't a flag being typed
-        elif ('-' + cur) not in words:
+        elif cur not in used_flags:
             return
 
         # complete flags which aren't already used
         for name in self.flags:
-            if ('-' + name) not in words:
+            if name not in used_flags:
                 if name.startswith(cur):
                     yield Completion(
                         name,
@@ -28,18 +28,15 @@ class HistoryEvent:
         self.undoable = True
 
     def __str__(self):
-        s = "{:<3} {} ({} redo, {} undo):".format(
+        lines = ["{:<3} {} ({} redo, {} undo):".format(
             self.index,
             self.name,
             "can" if self.redoable else "cannot",
             "can" if self.undoable else "cannot",
-        )
-        for request in self.requests:
-            s += "\n\t{} {}".format(
-                request["name"],
-                request["url"],
-            )
-        return s
+        )]
+        lines.extend("\t{} {}".format(request["name"], request["url"])
+                     for request in self.requests)
+        return "\n".join(lines)
 
     def __repr__(self):
         return "<{} event with {} requests>".format(self.name, len(self.requests))
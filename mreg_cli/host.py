@@ -1,5 +1,6 @@
 import ipaddress
 import typing
+from operator import attrgetter, itemgetter
 
 from .cli import Flag, cli
 from .dhcp import assoc_mac_to_ip
@@ -22,7 +23,6 @@ from .util import (
     get_network_reserved_ips,
     host_info_by_name,
     host_info_by_name_or_ip,
-    ip_in_mreg_net,
     is_valid_email,
     is_valid_ip,
     is_valid_ipv4,
@@ -77,22 +77,20 @@ def check_zone_for_hostname(name: str, force: bool, require_zone: bool = False):
         cli_warning(f"{name} is in zone delegation {delegation}, must force")
 
 
+def _ip_in_addresses(ip: str, addresses: typing.Iterable[str]) -> bool:
+    """Check if ip is one of addresses. Compares parsed addresses, not
+    strings, so that e.g. differently written IPv6 addresses still match."""
+    ip = ipaddress.ip_address(ip)
+    return any(ipaddress.ip_address(i) == ip for i in addresses)
+
+
 def _get_ip_from_args(ip, force, ipversion=None):
 
     # Try to fail fast for valid IP
     if ipversion is not None and is_valid_ip(ip):
-        if ipversion == 4:
-            # Fail if input isn't ipv4
-            if is_valid_ipv6(ip):
-                cli_warning("got ipv6 address, want ipv4.")
-            if not is_valid_ipv4(ip):
-                cli_warning(f"not valid ipv4 address: {ip}")
-        elif ipversion == 6:
-            # Fail if input isn't ipv6
-            if is_valid_ipv4(ip):
-                cli_warning("got ipv4 address, want ipv6.")
-            if not is_valid_ipv6(ip):
-                cli_warning(f"not valid ipv6 address: {ip}")
+        version = ipaddress.ip_address(ip).version
+        if version != ipversion:
+            cli_warning(f"got ipv{version} address, want ipv{ipversion}.")
 
     # Handle arbitrary ip from network if received a network w/o mask
     if ip.endswith("/"):
@@ -117,29 +115,35 @@ def _get_ip_from_args(ip, force, ipversion=None):
         cli_warning(f"Could not determine network for {ip}")
 
     network_object = ipaddress.ip_network(network['network'])
-    if ipversion:
-        if network_object.version != ipversion:
-            if ipversion == 4:
-                cli_warning("Attemptet to get an ipv4 address, but input yielded ipv6")
-            elif ipversion == 6:
-                cli_warning("Attemptet to get an ipv6 address, but input yielded ipv4")
+    if ipversion and network_object.version != ipversion:
+        cli_warning(f"Attemptet to get an ipv{ipversion} address, but input "
+                    f"yielded ipv{network_object.version}")
 
     if network["frozen"] and not force:
         cli_warning("network {} is frozen, must force"
                     .format(network["network"]))
     # Chat the address given isn't reserved
     reserved_addresses = get_network_reserved_ips(network['network'])
-    if ip in reserved_addresses and not force:
+    if not force and _ip_in_addresses(ip, reserved_addresses):
         cli_warning("Address is reserved. Requires force")
-    if network_object.num_addresses > 2:
-        if ip == network_object.network_address.exploded:
+    # IPv6 has no broadcast address, and the network address is only special
+    # for IPv4 here.
+    if network_object.version == 4 and network_object.num_addresses > 2:
+        ip_object = ipaddress.ip_address(ip)
+        if ip_object == network_object.network_address:
             cli_warning("Can't overwrite the network address of the network")
-        if ip == network_object.broadcast_address.exploded:
+        if ip_object == network_object.broadcast_address:
             cli_warning("Can't overwrite the broadcast address of the network")
 
     return ip
 
 
+def _find_ipaddress(records: typing.Iterable[dict], ip: str) -> dict:
+    """Return the ipaddress or ptr_override record with the given address,
+    or None. Stops at the first match."""
+    return next((i for i in records if i["ipaddress"] == ip), None)
+
+
 def _check_ipversion(ip, ipversion):
     # Ip sanity check
     if ipversion == 4:
@@ -378,7 +382,7 @@ def print_ipaddresses(ipaddresses: typing.Iterable[dict], names: bool = False,
                       padding: int = 14) -> None:
     """Pretty print given ip addresses"""
     def _find_padding(lst, attr):
-        return max(padding, max([len(i[attr]) for i in lst])+1)
+        return max(padding, max(len(i[attr]) for i in lst)+1)
     if not ipaddresses:
         return
     a_records = []
@@ -485,7 +489,7 @@ def _print_host_info(info):
         print_cname(cname["name"], info["name"])
     for txt in info["txts"]:
         print_txt(txt["txt"])
-    _srv_show(host_id=info['id'])
+    _srv_show(host_id=info['id'], host_name=info['name'])
     _naptr_show(info)
     _sshfp_show(info)
     if "bacnetid" in info:
@@ -835,7 +839,7 @@ def _ip_add(args, ipversion, macaddress=None):
             cli_warning("{} already has A/AAAA record(s), must force"
                         .format(info["name"]))
 
-        if any(args.ip == i["ipaddress"] for i in info["ipaddresses"]):
+        if _find_ipaddress(info["ipaddresses"], args.ip) is not None:
             cli_warning(f"Host already has IP {args.ip}")
 
         data = {
@@ -901,12 +905,10 @@ def _ip_change(args, ipversion):
     # Get host info or raise exception
     info = host_info_by_name(args.name)
 
-    for i in info["ipaddresses"]:
-        if i["ipaddress"] == args.old:
-            ip_id = i["id"]
-            break
-    else:
+    rec = _find_ipaddress(info["ipaddresses"], args.old)
+    if rec is None:
         cli_warning("\"{}\" is not owned by {}".format(args.old, info["name"]))
+    ip_id = rec["id"]
 
     new_ip = _get_ip_from_args(args.new, args.force, ipversion=ipversion)
 
@@ -969,14 +971,10 @@ def _ip_move(args, ipversion):
     _check_ipversion(args.ip, ipversion)
     frominfo = host_info_by_name(args.fromhost)
     toinfo = host_info_by_name(args.tohost)
-    ip_id = None
-    for ip in frominfo['ipaddresses']:
-        if ip['ipaddress'] == args.ip:
-            ip_id = ip['id']
-    ptr_id = None
-    for ptr in frominfo['ptr_overrides']:
-        if ptr['ipaddress'] == args.ip:
-            ptr_id = ptr['id']
+    ip = _find_ipaddress(frominfo['ipaddresses'], args.ip)
+    ip_id = ip['id'] if ip else None
+    ptr = _find_ipaddress(frominfo['ptr_overrides'], args.ip)
+    ptr_id = ptr['id'] if ptr else None
     if ip_id is None and ptr_id is None:
         cli_warning(f'Host {frominfo["name"]} have no IP or PTR with address {args.ip}')
     msg = ""
@@ -1028,18 +1026,14 @@ host.add_command(
 ##############################################
 
 def _ip_remove(args, ipversion):
-    ip_id = None
-
     _check_ipversion(args.ip, ipversion)
 
     # Check that ip belongs to host
     info = host_info_by_name(args.name)
-    for rec in info["ipaddresses"]:
-        if rec["ipaddress"] == args.ip.lower():
-            ip_id = rec["id"]
-            break
-    else:
+    rec = _find_ipaddress(info["ipaddresses"], args.ip.lower())
+    if rec is None:
         cli_warning("{} is not owned by {}".format(args.ip, info["name"]))
+    ip_id = rec["id"]
 
     old_data = {
         "host": info["id"],
@@ -1294,9 +1288,10 @@ def cname_add(args):
     info = host_info_by_name(args.name)
     alias = clean_hostname(args.alias)
 
-    # If alias name already exist as host, abort.
+    # If alias name already exist as host, abort. No need to follow cnames
+    # here, as the cname_exists() check below covers that case.
     try:
-        host_info_by_name(alias)
+        host_info_by_name(alias, follow_cname=False)
         cli_error("The alias name is in use by an existing host. Find a new alias.")
     except HostNotFoundWarning:
         pass
@@ -1732,7 +1727,7 @@ host.add_command(
 
 def _mx_in_mxs(mxs, priority, mx):
     for info in mxs:
-        if info['priority'] == priority and info['mx'] == mx:
+        if (info['priority'], info['mx']) == (priority, mx):
             return info['id']
     return None
 
@@ -1955,8 +1950,10 @@ def naptr_remove(args):
 
     data = None
     attrs = ('preference', 'order', 'flag', 'service', 'regex', 'replacement',)
+    wanted = attrgetter(*attrs)(args)
+    fields = itemgetter(*attrs)
     for naptr in naptrs:
-        if all(naptr[attr] == getattr(args, attr) for attr in attrs):
+        if fields(naptr) == wanted:
             data = naptr
 
     if data is None:
@@ -2143,13 +2140,11 @@ def ptr_remove(args):
     # Get host info or raise exception
     info = host_info_by_name(args.name)
 
-    for ptr in info['ptr_overrides']:
-        if ptr['ipaddress'] == args.ip:
-            ptr_id = ptr['id']
-            break
-    else:
+    ptr = _find_ipaddress(info['ptr_overrides'], args.ip)
+    if ptr is None:
         cli_warning("no PTR record for {} with ip {}".format(info["name"],
                                                              args.ip))
+    ptr_id = ptr['id']
 
     # Delete record
     path = f"/api/v1/ptroverrides/{ptr_id}"
@@ -2186,7 +2181,9 @@ def ptr_add(args):
     # Ip sanity check
     if not is_valid_ip(args.ip):
         cli_warning("invalid ip: {}".format(args.ip))
-    if not ip_in_mreg_net(args.ip):
+    # Fetched once and reused for the reserved address check below
+    network = get_network_by_ip(args.ip)
+    if not network:
         cli_warning("{} isn't in a network controlled by MREG".format(args.ip))
 
     # Get host info or raise exception
@@ -2206,9 +2203,8 @@ def ptr_add(args):
         cli_warning("{} isn't in a zone controlled by MREG, must force"
                     .format(info["name"]))
 
-    network = get_network_by_ip(args.ip)
     reserved_addresses = get_network_reserved_ips(network['network'])
-    if args.ip in reserved_addresses and not args.force:
+    if not args.force and _ip_in_addresses(args.ip, reserved_addresses):
         cli_warning("Address is reserved. Requires force")
 
     # create PTR record
@@ -2386,8 +2382,10 @@ def srv_remove(args):
 
     data = None
     attrs = ('name', 'priority', 'weight', 'port',)
+    wanted = attrgetter(*attrs)(args)
+    fields = itemgetter(*attrs)
     for srv in srvs:
-        if all(srv[attr] == getattr(args, attr) for attr in attrs):
+        if fields(srv) == wanted:
             data = srv
             break
 
@@ -2438,9 +2436,11 @@ host.add_command(
 #  Implementation of sub command 'srv_show'  #
 ##############################################
 
-def _srv_show(srvs=None, host_id=None):
+def _srv_show(srvs=None, host_id=None, host_name=None):
     assert srvs is not None or host_id is not None
     hostid2name = dict()
+    if host_id is not None and host_name is not None:
+        hostid2name[host_id] = host_name
     host_ids = set()
 
     def print_srv(srv: dict, hostname: str, padding: int = 14) -> None:
@@ -2465,18 +2465,19 @@ def _srv_show(srvs=None, host_id=None):
     if len(srvs) == 0:
         return
 
-    padding = 0
+    padding = max(len(srv["name"]) for srv in srvs)
 
     # Print records
     for srv in srvs:
-        if len(srv["name"]) > padding:
-            padding = len(srv["name"])
-        host_ids.add(str(srv['host']))
+        if srv['host'] not in hostid2name:
+            host_ids.add(str(srv['host']))
 
-    arg = ','.join(host_ids)
-    hosts = get_list("/api/v1/hosts/", params={"id__in": arg})
-    for host in hosts:
-        hostid2name[host['id']] = host['name']
+    # Only look up the names of hosts we don't already know
+    if host_ids:
+        arg = ','.join(host_ids)
+        hosts = get_list("/api/v1/hosts/", params={"id__in": arg})
+        for host in hosts:
+            hostid2name[host['id']] = host['name']
 
     prev_name = ""
     for srv in srvs:
@@ -2782,7 +2783,6 @@ host.add_command(
 def ttl_show(args):
     """Show ttl for name. If <name> is an alias the alias hosts TTL is shown.
     """
-    info = host_info_by_name(args.name)
     target_type, info = get_info_by_name(args.name)
     print_ttl(info["ttl"])
     cli_info("showed TTL for {}".format(info["name"]))
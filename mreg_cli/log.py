@@ -1,6 +1,6 @@
+import functools
 import getpass
 import inspect
-import re
 from datetime import datetime
 
 from .exceptions import CliError, CliWarning
@@ -11,19 +11,28 @@ logfile = None
 
 
 def _prefix_from_stack() -> str:
-    stack = inspect.stack()
-    stack.reverse()
+    # Walk the frame chain directly. inspect.stack() builds a FrameInfo and
+    # reads source lines for every frame, which is far too costly to do on
+    # each log entry when only the function names are needed.
+    names = []
+    frame = inspect.currentframe()
+    while frame is not None:
+        names.append(frame.f_code.co_name)
+        frame = frame.f_back
     prefix = ""
-    for f in stack:
-        m = re.match("^do_(?P<name>.+)$", f[3])
-        if m:
-            prefix += " " + m.group("name")
-        m = re.match("^opt_(?P<name>.+)$", f[3])
-        if m:
-            prefix += " " + m.group("name")
+    for name in reversed(names):
+        for start in ("do_", "opt_"):
+            if name.startswith(start) and len(name) > len(start):
+                prefix += " " + name[len(start):]
     return prefix.strip()
 
 
+@functools.lru_cache(maxsize=None)
+def _username() -> str:
+    # The OS user can't change while we run, so only look it up once.
+    return getpass.getuser()
+
+
 def _write_log(entry: str, end: str = "\n") -> None:
     if logfile is not None:
         with open(logfile, "a+") as f:
@@ -35,7 +44,7 @@ def cli_error(msg: str, raise_exception: bool = True, exception=CliError) -> Non
     pre = _prefix_from_stack()
     s = "{} {} [ERROR] {}: {}".format(
         datetime.now().isoformat(sep=' ', timespec="seconds"),
-        getpass.getuser(),
+        _username(),
         pre,
         msg,
     )
@@ -59,7 +68,7 @@ def cli_warning(msg: str, raise_exception: bool = True, exception=CliWarning) ->
     pre = _prefix_from_stack()
     s = "{} {} [WARNING] {}: {}".format(
         datetime.now().isoformat(sep=' ', timespec="seconds"),
-        getpass.getuser(),
+        _username(),
         pre,
         msg,
     )
@@ -82,7 +91,7 @@ def cli_info(msg: str, print_msg: bool = False) -> None:
     pre = _prefix_from_stack()
     s = "{} {} [OK] {}: {}".format(
         datetime.now().isoformat(sep=' ', timespec="seconds"),
-        getpass.getuser(),
+        _username(),
         pre,
         msg,
     )
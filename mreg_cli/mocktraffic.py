@@ -38,12 +38,8 @@ class MockTraffic(object):
         i.playback = True
         i.filename = filename
         i.line_num = 0
-        f = open(i.filename, 'r')
-        lns = f.readlines()
-        f.close()
-        i.mock_data = []
-        for ln in lns:
-            i.mock_data.append(json.loads(ln))
+        with open(i.filename, 'r') as f:
+            i.mock_data = [json.loads(ln) for ln in f]
 
     def is_recording(self) -> bool:
         return MockTraffic.__instance.recording
@@ -1,5 +1,4 @@
 import ipaddress
-import urllib.parse
 
 from .cli import Flag, cli
 from .history import history
@@ -19,6 +18,8 @@ from .util import (
     is_valid_ip,
     is_valid_location_tag,
     is_valid_network,
+    network_path,
+    parse_network,
     patch,
     post,
     string_to_int,
@@ -36,13 +37,17 @@ network = cli.add_command(
 
 
 def get_network_range_from_input(net):
+    """Return the network range for net, which may be a range or an IP.
+
+    A range is only normalized locally, so it costs no request. A missing
+    network is caught by the server when the range is used."""
     if net.endswith("/"):
         net = net[:-1]
     if is_valid_ip(net):
         network = get_network(net)
         return network['network']
     elif is_valid_network(net):
-        return net
+        return str(parse_network(net))
     else:
         cli_warning("Not a valid ip or network")
 
@@ -51,8 +56,7 @@ def get_network_range_from_input(net):
 def print_network_unused(count: int, padding: int = 25) -> None:
     "Pretty print amount of unused addresses"
     assert isinstance(count, int)
-    print(
-        "{1:<{0}}{2}{3}".format(padding, "Unused addresses:", count, " (excluding reserved adr.)"))
+    print(f"{'Unused addresses:':<{padding}}{count} (excluding reserved adr.)")
 
 
 def print_network_excluded_ranges(info: dict, padding: int = 25) -> None:
@@ -65,20 +69,19 @@ def print_network_excluded_ranges(info: dict, padding: int = 25) -> None:
         count += int(end_ip) - int(start_ip)
         if end_ip == start_ip:
             count += 1
-    print("{1:<{0}}{2} ipaddresses".format(padding, "Excluded ranges:", count))
+    print(f"{'Excluded ranges:':<{padding}}{count} ipaddresses")
     for i in info:
-        print("{1:<{0}}{2} -> {3}".format(padding, '', i['start_ip'], i['end_ip']))
+        print(f"{'':<{padding}}{i['start_ip']} -> {i['end_ip']}")
 
 
 def print_network_reserved(ip_range: str, reserved: int, padding: int = 25) -> None:
     "Pretty print ip range and reserved addresses list"
     assert isinstance(ip_range, str)
     assert isinstance(reserved, int)
-    network = ipaddress.ip_network(ip_range)
-    print("{1:<{0}}{2} - {3}".format(padding, "IP-range:", network.network_address,
-                                     network.broadcast_address))
-    print("{1:<{0}}{2}".format(padding, "Reserved host addresses:", reserved))
-    print("{1:<{0}}{2}{3}".format(padding, "", network.network_address, " (net)"))
+    network = parse_network(ip_range)
+    print(f"{'IP-range:':<{padding}}{network.network_address} - {network.broadcast_address}")
+    print(f"{'Reserved host addresses:':<{padding}}{reserved}")
+    print(f"{'':<{padding}}{network.network_address} (net)")
     res = get_network_reserved_ips(ip_range)
     res.remove(str(network.network_address))
     broadcast = False
@@ -86,13 +89,13 @@ def print_network_reserved(ip_range: str, reserved: int, padding: int = 25) -> N
         res.remove(str(network.broadcast_address))
         broadcast = True
     for host in res:
-        print("{1:<{0}}{2}".format(padding, "", host))
+        print(f"{'':<{padding}}{host}")
     if broadcast:
-        print("{1:<{0}}{2}{3}".format(padding, "", network.broadcast_address, " (broadcast)"))
+        print(f"{'':<{padding}}{network.broadcast_address} (broadcast)")
 
 
 def print_network(info: int, text: str, padding: int = 25) -> None:
-    print("{1:<{0}}{2}".format(padding, text, info))
+    print(f"{text:<{padding}}{info}")
 
 
 ##########################################
@@ -102,7 +105,6 @@ def print_network(info: int, text: str, padding: int = 25) -> None:
 def create(args):
     """Create a new network
     """
-    frozen = True if args.frozen else False
     if args.vlan:
         string_to_int(args.vlan, "VLAN")
     if args.category and not is_valid_category_tag(args.category):
@@ -110,17 +112,17 @@ def create(args):
     if args.location and not is_valid_location_tag(args.location):
         cli_warning("Not a valid location tag")
 
+    new_network = parse_network(args.network)
     networks_existing = get_list("/api/v1/networks/")
     for network in networks_existing:
-        network_object = ipaddress.ip_network(network['network'])
-        if network_object.overlaps(ipaddress.ip_network(args.network)):
-            cli_warning("Overlap found between new network {} and existing "
-                        "network {}".format(ipaddress.ip_network(args.network),
-                                            network['network']))
+        network_object = parse_network(network['network'])
+        if network_object.overlaps(new_network):
+            cli_warning(f"Overlap found between new network {new_network} and existing "
+                        f"network {network['network']}")
 
     post("/api/v1/networks/", network=args.network, description=args.desc, vlan=args.vlan,
-         category=args.category, location=args.location, frozen=frozen)
-    cli_info("created network {}".format(args.network), True)
+         category=args.category, location=args.location, frozen=args.frozen)
+    cli_info(f"created network {args.network}", True)
 
 
 network.add_command(
@@ -169,7 +171,7 @@ def info(args):
         network_info = get_network(ip_range)
         used = get_network_used_count(ip_range)
         unused = get_network_unused_count(ip_range)
-        network = ipaddress.ip_network(ip_range)
+        network = parse_network(ip_range)
 
         # Pretty print all network info
         print_network(network_info['network'], "Network:")
@@ -216,8 +218,7 @@ def list_unused_addresses(args):
     if not unused:
         cli_warning(f"No free addresses remaining on network {ip_range}")
 
-    for address in unused:
-        print("{1:<{0}}".format(25, address))
+    print("\n".join(f"{address:<25}" for address in unused))
 
 
 network.add_command(
@@ -241,30 +242,33 @@ def list_used_addresses(args):
     """Lists all the used addresses for a network
     """
     ip_range = get_network_range_from_input(args.network)
-    urlencoded_ip_range = urllib.parse.quote(ip_range)
+    network_url = network_path(ip_range)
 
-    path = f"/api/v1/networks/{urlencoded_ip_range}/used_host_list"
+    path = f"{network_url}/used_host_list"
     history.record_get(path)
     ip2host = get(path).json()
-    path = f"/api/v1/networks/{urlencoded_ip_range}/ptroverride_host_list"
+    path = f"{network_url}/ptroverride_host_list"
     history.record_get(path)
     ptr2host = get(path).json()
 
-    ips = ipsort(set(list(ip2host.keys()) + list(ptr2host.keys())))
+    ips = ipsort(ip2host.keys() | ptr2host.keys())
     if not ips:
         print(f"No used addresses on {ip_range}")
         return
 
+    # Print the whole listing at once, large networks have many addresses
+    lines = []
     for ip in ips:
         if ip in ptr2host:
-            print("{1:<{0}}{2} (ptr override)".format(25, ip, ptr2host[ip]))
+            lines.append(f"{ip:<25}{ptr2host[ip]} (ptr override)")
         elif ip in ip2host:
             if len(ip2host[ip]) > 1:
                 hosts = ",".join(ip2host[ip])
                 host = f"{hosts} (NO ptr override!!)"
             else:
                 host = ip2host[ip][0]
-            print("{1:<{0}}{2}".format(25, ip, host))
+            lines.append(f"{ip:<25}{host}")
+    print("\n".join(lines))
 
 
 network.add_command(
@@ -287,7 +291,7 @@ network.add_command(
 def remove(args):
     """Remove network
     """
-    ipaddress.ip_network(args.network)
+    parse_network(args.network)
     host_list = get_network_used_list(args.network)
     if host_list:
         cli_warning("Network contains addresses that are in use. Remove hosts "
@@ -296,8 +300,8 @@ def remove(args):
     if not args.force:
         cli_warning("Must force.")
 
-    delete(f"/api/v1/networks/{urllib.parse.quote(args.network)}")
-    cli_info("removed network {}".format(args.network), True)
+    delete(network_path(args.network))
+    cli_info(f"removed network {args.network}", True)
 
 
 network.add_command(
@@ -322,14 +326,15 @@ network.add_command(
 
 def add_excluded_range(args):
     """Add an excluded range to a network"""
-    info = get_network(args.network)
-    network = info['network']
     if not is_valid_ip(args.start_ip):
         cli_error(f"Start ipaddress {args.start_ip} not valid")
     if not is_valid_ip(args.end_ip):
         cli_error(f"End ipaddress {args.end_ip} not valid")
 
-    path = f"/api/v1/networks/{urllib.parse.quote(network)}/excluded_ranges/"
+    info = get_network(args.network)
+    network = info['network']
+
+    path = f"{network_path(network)}/excluded_ranges/"
     data = {'network': info['id'],
             'start_ip': args.start_ip,
             'end_ip': args.end_ip}
@@ -362,20 +367,20 @@ network.add_command(
 
 def remove_excluded_range(args):
     """Remove an excluded range to a network"""
-    info = get_network(args.network)
-    network = info['network']
-
     if not is_valid_ip(args.start_ip):
         cli_error(f"Start ipaddress {args.start_ip} not valid")
     if not is_valid_ip(args.end_ip):
         cli_error(f"End ipaddress {args.end_ip} not valid")
 
+    info = get_network(args.network)
+    network = info['network']
+
     if not info['excluded_ranges']:
         cli_error(f'Network {network} has no excluded ranges')
 
     for i in info['excluded_ranges']:
         if i['start_ip'] == args.start_ip and i['end_ip'] == args.end_ip:
-            path = f"/api/v1/networks/{urllib.parse.quote(network)}/excluded_ranges/{i['id']}"
+            path = f"{network_path(network)}/excluded_ranges/{i['id']}"
             break
     else:
         cli_error('Found no matching exclude range.')
@@ -409,14 +414,13 @@ network.add_command(
 def set_category(args):
     """Set category tag for network
     """
-    network = get_network(args.network)
     if not is_valid_category_tag(args.category):
         cli_warning("Not a valid category tag")
+    ip_range = get_network_range_from_input(args.network)
 
-    path = f"/api/v1/networks/{urllib.parse.quote(network['network'])}"
+    path = network_path(ip_range)
     patch(path, category=args.category)
-    cli_info("updated category tag to '{}' for {}"
-             .format(args.category, network['network']), True)
+    cli_info(f"updated category tag to '{args.category}' for {ip_range}", True)
 
 
 network.add_command(
@@ -442,11 +446,10 @@ network.add_command(
 def set_description(args):
     """Set description for network
     """
-    network = get_network(args.network)
-    path = f"/api/v1/networks/{urllib.parse.quote(network['network'])}"
+    ip_range = get_network_range_from_input(args.network)
+    path = network_path(ip_range)
     patch(path, description=args.description)
-    cli_info("updated description to '{}' for {}".format(args.description,
-                                                         network['network']), True)
+    cli_info(f"updated description to '{args.description}' for {ip_range}", True)
 
 
 network.add_command(
@@ -474,8 +477,7 @@ def set_dns_delegated(args):
     """
 
     ip_range = get_network_range_from_input(args.network)
-    get_network(ip_range)
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}"
+    path = network_path(ip_range)
     patch(path, dns_delegated=True)
     cli_info(f"updated dns_delegated to 'True' for {ip_range}", print_msg=True)
 
@@ -502,8 +504,7 @@ def set_frozen(args):
     """
 
     ip_range = get_network_range_from_input(args.network)
-    get_network(ip_range)
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}"
+    path = network_path(ip_range)
     patch(path, frozen=True)
     cli_info(f"updated frozen to 'True' for {ip_range}", print_msg=True)
 
@@ -529,15 +530,13 @@ def set_location(args):
     """Set location tag for network
     """
 
-    ip_range = get_network_range_from_input(args.network)
-    get_network(ip_range)
     if not is_valid_location_tag(args.location):
         cli_warning("Not a valid location tag")
+    ip_range = get_network_range_from_input(args.network)
 
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}"
+    path = network_path(ip_range)
     patch(path, location=args.location)
-    cli_info("updated location tag to '{}' for {}"
-             .format(args.location, ip_range), True)
+    cli_info(f"updated location tag to '{args.location}' for {ip_range}", True)
 
 
 network.add_command(
@@ -565,9 +564,8 @@ def set_reserved(args):
     """
 
     ip_range = get_network_range_from_input(args.network)
-    get_network(ip_range)
     reserved = args.number
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}"
+    path = network_path(ip_range)
     patch(path, reserved=reserved)
     cli_info(f"updated reserved to '{reserved}' for {ip_range}",
              print_msg=True)
@@ -599,8 +597,7 @@ def set_vlan(args):
     """
 
     ip_range = get_network_range_from_input(args.network)
-    get_network(ip_range)
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}"
+    path = network_path(ip_range)
     patch(path, vlan=args.vlan)
     cli_info(f"updated vlan to {args.vlan} for {ip_range}", print_msg=True)
 
@@ -631,8 +628,7 @@ def unset_dns_delegated(args):
     """
 
     ip_range = get_network_range_from_input(args.network)
-    get_network(ip_range)
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}"
+    path = network_path(ip_range)
     patch(path, dns_delegated=False)
     cli_info(f"updated dns_delegated to 'False' for {ip_range}", print_msg=True)
 
@@ -659,8 +655,7 @@ def unset_frozen(args):
     """
 
     ip_range = get_network_range_from_input(args.network)
-    get_network(ip_range)
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}"
+    path = network_path(ip_range)
     patch(path, frozen=False)
     cli_info(f"updated frozen to 'False' for {ip_range}", print_msg=True)
 
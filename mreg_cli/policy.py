@@ -51,6 +51,10 @@ def get_atom_or_role(name):
     cli_warning(f'Could not find an atom or a role with name: {name!r}')
 
 
+def _role_has_atom(info, atom):
+    return any(i['name'] == atom for i in info['atoms'])
+
+
 """
 Implementation of sub command 'atom_create'
 """
@@ -220,10 +224,9 @@ def add_atom(args):
     """
 
     info = get_role(args.role)
-    for atom in info['atoms']:
-        if args.atom == atom['name']:
-            cli_info(f"Atom {args.atom!r} already a member of role {args.role!r}", print_msg=True)
-            return
+    if _role_has_atom(info, args.atom):
+        cli_info(f"Atom {args.atom!r} already a member of role {args.role!r}", print_msg=True)
+        return
     get_atom(args.atom)
 
     data = {'name': args.atom}
@@ -255,10 +258,7 @@ def remove_atom(args):
     """
 
     info = get_role(args.role)
-    for atom in info['atoms']:
-        if args.atom == atom['name']:
-            break
-    else:
+    if not _role_has_atom(info, args.atom):
         cli_warning(f"Atom {args.atom!r} not a member of {args.role!r}")
 
     path = f'/api/v1/hostpolicy/roles/{args.role}/atoms/{args.atom}'
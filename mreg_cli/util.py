@@ -1,3 +1,4 @@
+import functools
 import ipaddress
 import json
 import logging
@@ -8,6 +9,8 @@ import typing
 import urllib.parse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from prompt_toolkit import prompt
 
@@ -16,11 +19,26 @@ from .history import history
 from .log import cli_error, cli_warning
 from . import mocktraffic
 
-location_tags = []
-category_tags = []
+default_domain = None
+location_tags = set()
+category_tags = set()
 
 session = requests.Session()
 session.headers.update({'User-Agent': 'mreg-cli'})
+# All requests go to the same server, so keep the connection alive between
+# commands and quietly retry reads on a dropped connection. Only connection
+# and read errors on GET/HEAD are retried; error statuses, Retry-After
+# included, are returned as is so result_check can report them.
+_adapter = HTTPAdapter(max_retries=Retry(
+    total=2,
+    backoff_factor=0.1,
+    status=0,
+    allowed_methods=frozenset({"GET", "HEAD"}),
+    respect_retry_after_header=False,
+    raise_on_status=False,
+))
+session.mount('http://', _adapter)
+session.mount('https://', _adapter)
 
 mreg_auth_token_file = os.path.join(str(os.getenv('HOME')), '.mreg-cli_auth_token')
 
@@ -28,6 +46,17 @@ logger = logging.getLogger(__name__)
 
 HTTP_TIMEOUT = 20
 
+# Validation patterns, compiled once at import
+# Matches the same names as "^(\*\.)?([a-z0-9_][a-z0-9\-]*\.?)+$", but is
+# written label by label so the regex engine can't backtrack exponentially on
+# long invalid input.
+_HOSTNAME_RE = re.compile(
+    r"^(\*\.)?[a-z0-9_][a-z0-9_\-]*(\.[a-z0-9_][a-z0-9_\-]*)*\.?$")
+_MAC_RE = re.compile(r"^([a-fA-F0-9]{2}[\.:-]?){5}[a-fA-F0-9]{2}$")
+_EMAIL_RE = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
+# Used with str.translate to strip MAC address delimiters
+_MAC_DELIMITERS = str.maketrans('', '', '.:-')
+
 
 def error(msg, code=os.EX_UNAVAILABLE):
     print(f"ERROR: {msg}", file=sys.stderr)
@@ -35,8 +64,10 @@ def error(msg, code=os.EX_UNAVAILABLE):
 
 
 def set_config(cfg):
-    global config
+    global config, default_domain
     config = cfg
+    # Looked up once here instead of on every clean_hostname() call
+    default_domain = cfg.get('domain')
 
 
 def host_exists(name: str) -> bool:
@@ -50,14 +81,12 @@ def host_exists(name: str) -> bool:
 
     # Response data sanity checks
     if len(hosts) > 1:
-        cli_error("host exist check received more than one exact match for \"{}\"".format(name))
+        cli_error(f"host exist check received more than one exact match for \"{name}\"")
     if len(hosts) == 0:
         return False
     if hosts[0]["name"] != name:
-        cli_error("host exist check received from API \"{}\" when searched for \"{}\"".format(
-            hosts[0]["name"],
-            name,
-        ))
+        cli_error(f"host exist check received from API \"{hosts[0]['name']}\" "
+                  f"when searched for \"{name}\"")
     return True
 
 
@@ -163,16 +192,10 @@ def first_unused_ip_from_network(network: dict) -> str:
 
     unused = get_network_first_unused(network['network'])
     if not unused:
-        cli_warning("No free addresses remaining on network {}".format(network['network']))
+        cli_warning(f"No free addresses remaining on network {network['network']}")
     return unused
 
 
-def ip_in_mreg_net(ip: str) -> bool:
-    """Return true if the ip is in a MREG controlled network"""
-    net = get_network_by_ip(ip)
-    return bool(net)
-
-
 ################################################################################
 #                                                                              #
 #   HTTP requests wrappers with error checking                                 #
@@ -251,8 +274,10 @@ def update_token():
 def _update_token(username, password):
     tokenurl = requests.compat.urljoin(mregurl, '/api/token-auth/')
     try:
-        result = requests.post(tokenurl, {'username': username,
-                                          'password': password})
+        # Reuse the session's connection, but don't send a stale token along.
+        result = session.post(tokenurl, {'username': username,
+                                         'password': password},
+                              headers={'Authorization': None})
     except requests.exceptions.ConnectionError as err:
         error(err)
     except requests.exceptions.SSLError as e:
@@ -284,12 +309,19 @@ def result_check(result, type, url):
         except ValueError:
             pass
         else:
-            message += "\n{}".format(json.dumps(body, indent=2))
+            message += f"\n{json.dumps(body, indent=2)}"
         cli_warning(message)
 
 
+@functools.lru_cache(maxsize=1024)
+def _join_url(base: str, path: str) -> str:
+    """Resolve path against base. The same few API paths are requested over
+    and over, so memoize instead of re-parsing both URLs on every request."""
+    return requests.compat.urljoin(base, path)
+
+
 def _request_wrapper(type, path, params={}, ok404=False, first=True, use_json=False, **data):
-    url = requests.compat.urljoin(mregurl, path)
+    url = _join_url(mregurl, path)
     mh = mocktraffic.MockTraffic()
 
     if mh.is_playback():
@@ -386,10 +418,10 @@ def resolve_ip(ip: str) -> str:
 
     # Response data sanity check
     if len(hosts) > 1:
-        cli_error("resolve ip got multiple matches for ip \"{}\"".format(ip))
+        cli_error(f"resolve ip got multiple matches for ip \"{ip}\"")
 
     if len(hosts) == 0:
-        cli_warning("{} doesnt belong to any host".format(ip), exception=HostNotFoundWarning)
+        cli_warning(f"{ip} doesnt belong to any host", exception=HostNotFoundWarning)
     return hosts[0]["name"]
 
 
@@ -407,7 +439,7 @@ def resolve_input_name(name: str) -> str:
     if len(hosts) == 1:
         assert hosts[0]["name"] == hostname
         return hostname
-    cli_warning("host not found: {}".format(name), exception=HostNotFoundWarning)
+    cli_warning(f"host not found: {name}", exception=HostNotFoundWarning)
 
 
 ################################################################################
@@ -420,13 +452,13 @@ def clean_hostname(name: typing.AnyStr) -> str:
     """ Converts from short to long hostname, if no domain found. """
     # bytes?
     if not isinstance(name, (str, bytes)):
-        cli_warning("Invalid input for hostname: {}".format(name))
+        cli_warning(f"Invalid input for hostname: {name}")
 
     name = name.lower()
 
     # invalid characters?
-    if re.search("^(\*\.)?([a-z0-9_][a-z0-9\-]*\.?)+$", name) is None:
-        cli_warning("Invalid input for hostname: {}".format(name))
+    if _HOSTNAME_RE.search(name) is None:
+        cli_warning(f"Invalid input for hostname: {name}")
 
     # Assume user is happy with domain, but strip the dot.
     if name.endswith("."):
@@ -437,8 +469,8 @@ def clean_hostname(name: typing.AnyStr) -> str:
         return name
 
     # Append domain name if in config and it does not end with it
-    if 'domain' in config and not name.endswith(config['domain']):
-        return "{}.{}".format(name, config['domain'])
+    if default_domain is not None and not name.endswith(default_domain):
+        return f"{name}.{default_domain}"
     return name
 
 ################################################################################
@@ -452,6 +484,12 @@ def ipsort(ips: list) -> list:
     return sorted(ips, key=lambda i: ipaddress.ip_address(i))
 
 
+@functools.lru_cache(maxsize=256)
+def network_path(ip_range: str) -> str:
+    "Returns the API path of the given network, with the range url quoted"
+    return f"/api/v1/networks/{urllib.parse.quote(ip_range)}"
+
+
 def get_network_by_ip(ip: str) -> dict:
     if is_valid_ip(ip):
         path = f"/api/v1/networks/ip/{urllib.parse.quote(ip)}"
@@ -467,7 +505,7 @@ def get_network_by_ip(ip: str) -> dict:
 def get_network(ip: str) -> dict:
     "Returns network associated with given range or IP"
     if is_valid_network(ip):
-        path = f"/api/v1/networks/{urllib.parse.quote(ip)}"
+        path = network_path(ip)
         history.record_get(path)
         return get(path).json()
     elif is_valid_ip(ip):
@@ -481,42 +519,42 @@ def get_network(ip: str) -> dict:
 
 def get_network_used_count(ip_range: str):
     "Return a count of the addresses in use on a given network"
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}/used_count"
+    path = f"{network_path(ip_range)}/used_count"
     history.record_get(path)
     return get(path).json()
 
 
 def get_network_used_list(ip_range: str):
     "Return a list of the addresses in use on a given network"
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}/used_list"
+    path = f"{network_path(ip_range)}/used_list"
     history.record_get(path)
     return get(path).json()
 
 
 def get_network_unused_count(ip_range: str):
     "Return a count of the unused addresses on a given network"
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}/unused_count"
+    path = f"{network_path(ip_range)}/unused_count"
     history.record_get(path)
     return get(path).json()
 
 
 def get_network_unused_list(ip_range: str):
     "Return a list of the unused addresses on a given network"
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}/unused_list"
+    path = f"{network_path(ip_range)}/unused_list"
     history.record_get(path)
     return get(path).json()
 
 
 def get_network_first_unused(ip_range: str):
     "Returns the first unused address on a network, if any"
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}/first_unused"
+    path = f"{network_path(ip_range)}/first_unused"
     history.record_get(path)
     return get(path).json()
 
 
 def get_network_reserved_ips(ip_range: str):
     "Returns the first unused address on a network, if any"
-    path = f"/api/v1/networks/{urllib.parse.quote(ip_range)}/reserved_list"
+    path = f"{network_path(ip_range)}/reserved_list"
     history.record_get(path)
     return get(path).json()
 
@@ -525,7 +563,7 @@ def string_to_int(value, error_tag):
     try:
         return int(value)
     except ValueError:
-        cli_warning("%s: Not a valid integer" % error_tag)
+        cli_warning(f"{error_tag}: Not a valid integer")
 
 
 ################################################################################
@@ -534,45 +572,62 @@ def string_to_int(value, error_tag):
 #                                                                              #
 ################################################################################
 
+@functools.lru_cache(maxsize=4096)
+def _ip_address(ip: str):
+    """Parse ip, or return None if it isn't an address. Cached since the
+    same input is usually validated several times during a command."""
+    try:
+        return ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _ip_network(net: str):
+    """Parse net, or return None if it isn't a network."""
+    try:
+        return ipaddress.ip_network(net)
+    except ValueError:
+        return None
+
+
+def parse_network(net: str):
+    """Parse net like ipaddress.ip_network, using the same cache as the
+    validators. Raises ValueError if net isn't a network."""
+    network = _ip_network(net)
+    if network is None:
+        # Parse again uncached, to raise the usual error
+        return ipaddress.ip_network(net)
+    return network
+
+
 def is_valid_ip(ip: str) -> bool:
     """Check if ip is valid ipv4 og ipv6."""
-    return is_valid_ipv4(ip) or is_valid_ipv6(ip)
+    return _ip_address(ip) is not None
 
 
 def is_valid_ipv4(ip: str) -> bool:
     """Check if ip is valid ipv4"""
-    try:
-        ipaddress.IPv4Address(ip)
-    except ValueError:
-        return False
-    else:
-        return True
+    address = _ip_address(ip)
+    return address is not None and address.version == 4
 
 
 def is_valid_ipv6(ip: str) -> bool:
     """Check if ip is valid ipv6"""
-    try:
-        ipaddress.IPv6Address(ip)
-    except ValueError:
-        return False
-    else:
-        return True
+    address = _ip_address(ip)
+    return address is not None and address.version == 6
 
 
 def is_valid_network(net: str) -> bool:
     """Check if net is a valid network"""
     if is_valid_ip(net):
         return False
-    try:
-        ipaddress.ip_network(net)
-        return True
-    except ValueError:
-        return False
+    return _ip_network(net) is not None
 
 
 def is_valid_mac(mac: str) -> bool:
     """Check if mac is a valid MAC address"""
-    return bool(re.match(r"^([a-fA-F0-9]{2}[\.:-]?){5}[a-fA-F0-9]{2}$", mac))
+    return _MAC_RE.match(mac) is not None
 
 
 def is_valid_ttl(ttl: typing.Union[int, str, bytes]) -> bool:  # int?
@@ -594,7 +649,7 @@ def is_valid_email(email: typing.AnyStr) -> bool:
             email = str(email)
         except ValueError:
             return False
-    return True if re.match(r"^[^\s@]+@[^\s@]+\.[^\s@]+$", email) else False
+    return _EMAIL_RE.match(email) is not None
 
 
 def is_valid_location_tag(loc: str) -> bool:
@@ -613,8 +668,8 @@ def format_mac(mac: str) -> str:
     Replaces any other delimiters with a colon and turns it into all lower
     case.
     """
-    mac = re.sub('[.:-]', '', mac).lower()
-    return ":".join(["%s" % (mac[i:i+2]) for i in range(0, 12, 2)])
+    mac = mac.translate(_MAC_DELIMITERS).lower()
+    return ":".join(mac[i:i+2] for i in range(0, 12, 2))
 
 
 def convert_wildcard_to_filter(param, arg):
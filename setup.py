@@ -10,6 +10,7 @@ install_requirements = [
     'python-dateutil',
     'prompt_toolkit>=2',
     'requests',
+    'urllib3',
 ]
 
 